@@ -4,12 +4,15 @@ from sqlalchemy import engine_from_config, pool
 
 from alembic import context
 from nearquake.app.db import Base
-from nearquake.config import POSTGRES_CONNECTION_URL
+from nearquake.config import get_postgres_connection_url
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", POSTGRES_CONNECTION_URL)
+# escape '%' from URL-encoded credentials, since the config values are interpolated
+config.set_main_option(
+    "sqlalchemy.url", get_postgres_connection_url().replace("%", "%%")
+)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
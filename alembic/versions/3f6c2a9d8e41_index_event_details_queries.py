@@ -0,0 +1,51 @@
+"""Index the event details columns used by the location and tweet queries
+
+Revision ID: 3f6c2a9d8e41
+Revises:
+Create Date: 2026-10-16 23:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6c2a9d8e41"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes declared next to EventDetails in nearquake/app/db.py
+INDEXES = {
+    "ix_event_details_date_id_event": ["date", "id_event"],
+    "ix_event_details_mag_ts_event_utc": ["mag", "ts_event_utc"],
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, and it doesn't lock out the
+    # live uploads while the indexes are built. Databases created by create_all() already
+    # have the indexes, so they're skipped there.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                "fct__event_details",
+                columns,
+                schema="earthquake",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name="fct__event_details",
+                schema="earthquake",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -1,26 +1,59 @@
 import argparse
-import random
 from datetime import datetime, timedelta
 
 from nearquake.app.db import EventDetails, create_database
 from nearquake.config import (
-    CHAT_PROMPT,
     EARTHQUAKE_POST_THRESHOLD,
-    POSTGRES_CONNECTION_URL,
+    chat_prompt,
     generate_time_period_url,
+    get_postgres_connection_url,
     tweet_conclusion_text,
 )
 from nearquake.data_processor import (
     TweetEarthquakeEvents,
     UploadEarthQuakeEvents,
     UploadEarthQuakeLocation,
-    get_date_range_summary,
+    get_date_range_counts,
 )
 from nearquake.post_manager import post_and_save_tweet
 from nearquake.open_ai_client import generate_response
 from nearquake.utils import convert_datetime, format_earthquake_alert
 from nearquake.utils.db_sessions import DbSessionManager
 
+_PERIOD_TEXT = {
+    "day": "Yesterday",
+    "week": "During the past week",
+    "month": "During the past month",
+}
+
+
+def post_summary(conn, period: str, start_date, end_date) -> None:
+    """
+    Post a summary of the earthquakes recorded between two dates and save it to the database.
+
+    :param conn: Database connection object.
+    :param period: The summary period, either 'day', 'week' or 'month'.
+    :param start_date: The start date of the summary.
+    :param end_date: The end date of the summary.
+    """
+    total, greater_than_5 = get_date_range_counts(
+        conn=conn,
+        model=EventDetails,
+        start_date=start_date,
+        end_date=end_date,
+        magnitude_threshold=EARTHQUAKE_POST_THRESHOLD,
+    )
+
+    message = f"{_PERIOD_TEXT[period]}, there were {total:,} #earthquakes globally, with {greater_than_5} of them registering a magnitude of 5.0 or higher. {tweet_conclusion_text()}"
+
+    tweet_text = format_earthquake_alert(
+        post_type="fact",
+        message=message,
+    )
+    if tweet_text:
+        post_and_save_tweet(tweet_text, conn)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Nearquake Data Processor")
 
@@ -60,7 +93,7 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    conn = DbSessionManager(url=POSTGRES_CONNECTION_URL)
+    conn = DbSessionManager(url=get_postgres_connection_url())
 
     with conn:
         run = UploadEarthQuakeEvents(conn=conn)
@@ -83,80 +116,35 @@ if __name__ == "__main__":
             today = datetime.now().date()
             yesterday = today - timedelta(days=1)
             start_date = yesterday - timedelta(days=1)
-            content = get_date_range_summary(
-                conn=conn, model=EventDetails, start_date=start_date, end_date=yesterday
+            post_summary(
+                conn=conn, period="day", start_date=start_date, end_date=yesterday
             )
 
-            GREATER_THAN_5 = sum(
-                1
-                for i in content
-                if i.mag is not None and i.mag >= EARTHQUAKE_POST_THRESHOLD
-            )
-            TWEET_CONCLUSION_TEXT = tweet_conclusion_text()
-            message = f"Yesterday, there were {len(content):,} #earthquakes globally, with {GREATER_THAN_5} of them registering a magnitude of 5.0 or higher. {TWEET_CONCLUSION_TEXT}"
-
-            tweet_text = format_earthquake_alert(
-                post_type="fact",
-                message=message,
-            )
-            if tweet_text:
-                post_and_save_tweet(tweet_text, conn)
-
         if args.weekly:
             run.upload(url=generate_time_period_url("week"))
 
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=7)
-            content = get_date_range_summary(
-                conn=conn, model=EventDetails, start_date=start_date, end_date=end_date
+            post_summary(
+                conn=conn, period="week", start_date=start_date, end_date=end_date
             )
 
-            GREATER_THAN_5 = sum(
-                1
-                for i in content
-                if i.mag is not None and i.mag >= EARTHQUAKE_POST_THRESHOLD
-            )
-            TWEET_CONCLUSION_TEXT = tweet_conclusion_text()
-
-            message = f"During the past week, there were {len(content):,} #earthquakes globally, with {GREATER_THAN_5} of them registering a magnitude of 5.0 or higher. {TWEET_CONCLUSION_TEXT}"
-
-            tweet_text = format_earthquake_alert(
-                post_type="fact",
-                message=message,
-            )
-            if tweet_text:
-                post_and_save_tweet(tweet_text, conn)
-
         if args.monthly:
             run.upload(url=generate_time_period_url("month"))
 
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=30)
-            content = get_date_range_summary(
-                conn=conn, model=EventDetails, start_date=start_date, end_date=end_date
-            )
-
-            GREATER_THAN_5 = sum(
-                1
-                for i in content
-                if i.mag is not None and i.mag >= EARTHQUAKE_POST_THRESHOLD
+            post_summary(
+                conn=conn, period="month", start_date=start_date, end_date=end_date
             )
-            TWEET_CONCLUSION_TEXT = tweet_conclusion_text()
-
-            message = f"During the past month, there were {len(content):,} #earthquakes globally, with {GREATER_THAN_5} of them registering a magnitude of 5.0 or higher. {TWEET_CONCLUSION_TEXT}"
-
-            tweet_text = format_earthquake_alert(
-                post_type="fact",
-                message=message,
-            )
-            if tweet_text:
-                post_and_save_tweet(tweet_text, conn)
 
         if args.initialize:
-            create_database(url=POSTGRES_CONNECTION_URL, schema=["earthquake", "tweet"])
+            create_database(
+                url=get_postgres_connection_url(), schema=["earthquake", "tweet"]
+            )
 
         if args.fun:
-            prompt = random.choice(CHAT_PROMPT)
+            prompt = chat_prompt()
             message = generate_response(prompt=prompt)
 
             tweet_text = format_earthquake_alert(post_type="fact", message=message)
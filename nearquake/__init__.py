@@ -3,11 +3,9 @@ import logging
 import logging.handlers
 import sys
 
-from nearquake.config import TIMESTAMP_NOW
+from nearquake.config import timestamp_now
 from nearquake.utils import create_dir
 
-TIMESTAMP_NOW = TIMESTAMP_NOW.strftime("%Y%m%d")
-
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -62,8 +60,9 @@ def setup_logging():
     logger.addHandler(console_handler)
 
     # File Handler with Log Rotation and JSON Formatter
+    log_date = timestamp_now().strftime("%Y%m%d")
     file_handler = logging.handlers.RotatingFileHandler(
-        f"logs/{TIMESTAMP_NOW}-nearquake.log", maxBytes=1048576, backupCount=5
+        f"logs/{log_date}-nearquake.log", maxBytes=1048576, backupCount=5
     )
 
     file_handler.addFilter(FilterForHandler("file"))
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Date,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     create_engine,
@@ -48,6 +49,12 @@ class EventDetails(Base):
     location = relationship("LocationDetails", back_populates="event_detail")
 
 
+# The location backfill filters on date and anti-joins on id_event. The tweet query
+# filters on a magnitude threshold and then on how recently the earthquake happened.
+Index("ix_event_details_date_id_event", EventDetails.date, EventDetails.id_event)
+Index("ix_event_details_mag_ts_event_utc", EventDetails.mag, EventDetails.ts_event_utc)
+
+
 class Post(Base):
     __tablename__ = "fct__post"
     __table_args__ = {"schema": "tweet"}
@@ -105,7 +112,8 @@ def create_schema(engine, schema_names):
         create_schema_sql = text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
         connection.execute(create_schema_sql)
         _logger.info(
-            f"Successfuly created a new schema with the name: {schema_name} in the datase"
+            "Successfuly created a new schema with the name: %s in the datase",
+            schema_name,
         )
 
 
@@ -1,15 +1,17 @@
-import logging
 import os
 import random
-from datetime import UTC, datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+from urllib.parse import quote, urlunsplit
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-_logger = logging.getLogger(__name__)
+from nearquake.config.prompts import CHAT_PROMPT, CHAT_PROMPT_SUFFIX, TWEET_CONCLUSION
 
-load_dotenv()
-
-TIMESTAMP_NOW = datetime.now(UTC)
+# Private generator for picking post text, so the picks can be seeded independently
+_random = random.Random()
 
 API_BASE_URL: str = (
     "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_{time_period}.geojson"
@@ -28,108 +30,209 @@ EARTHQUAKE_POST_THRESHOLD = 4.5
 REPORTED_SINCE_THRESHOLD = 7200
 
 
-def generate_time_range_url(start: int, end: int) -> str:
+def timestamp_now() -> datetime:
+    """
+    Get the current time in UTC.
+
+    :return: A timezone aware datetime for the current UTC time.
+    """
+    return datetime.now(timezone.utc)
+
+
+# Every valid time period mapped to its feed URL, so lookups never format the template
+_TIME_PERIOD_URLS = {
+    time_period: API_BASE_URL.format(time_period=time_period)
+    for time_period in ("hour", "day", "week", "month")
+}
+
+# Literal fragments of EVENT_DETAIL_URL around {id}, split once at import
+_EVENT_DETAIL_URL_PREFIX, _EVENT_DETAIL_URL_SUFFIX = EVENT_DETAIL_URL.split("{id}")
+
+# Literal fragments of EARTHQUAKE_URL_TEMPLATE around {start} and {end}, split once at import
+_TIME_RANGE_URL_PREFIX, _TIME_RANGE_URL_MIDDLE, _TIME_RANGE_URL_SUFFIX = (
+    EARTHQUAKE_URL_TEMPLATE.replace("{end}", "{start}").split("{start}")
+)
+
+
+@lru_cache(maxsize=1024)
+def generate_time_range_url(start: str, end: str) -> str:
     """
-    Generate the URL for extracting earthquakes that occurred during a specific year and month.
+    Generate the URL for extracting earthquakes that occurred between two dates.
 
-    Example usage: generate_time_range_url('2018','01', '12')
+    Example usage: generate_time_range_url('2018-01-01', '2018-01-15')
 
-    :param year: Year
-    :param month: Month
+    :param start: Start date in 'YYYY-MM-DD' format
+    :param end: End date in 'YYYY-MM-DD' format
 
-    :return: The URL path for the earthquakes that happened during the specified month and year.
+    :return: The URL path for the earthquakes that happened between the start and end dates.
     """
-    return EARTHQUAKE_URL_TEMPLATE.format(start=start, end=end)
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d")
+        end_date = datetime.strptime(end, "%Y-%m-%d")
+    except ValueError as err:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.") from err
+
+    if start_date > end_date:
+        raise ValueError(f"Start date {start} must not be after end date {end}")
+
+    return f"{_TIME_RANGE_URL_PREFIX}{start}{_TIME_RANGE_URL_MIDDLE}{end}{_TIME_RANGE_URL_SUFFIX}"
 
 
-def generate_time_period_url(time_period: int) -> str:
+def generate_event_detail_url(id_event: str) -> str:
     """
-    Generate the URL for extracting earthquakes that occurred during a specific time.
+    Generate the URL of the USGS event page for an earthquake.
 
-    :param time: The time period for the query. Options are 'day', 'week', 'month'.
-    :return: The URL path for the earthquakes that happened during the specified month and year.
+    :param id_event: The USGS earthquake id.
+    :return: The URL of the earthquake's event page.
     """
+    return f"{_EVENT_DETAIL_URL_PREFIX}{id_event}{_EVENT_DETAIL_URL_SUFFIX}"
+
 
-    valid_periods = {"hour", "day", "week", "month"}
-    if time_period not in valid_periods:
+def generate_time_period_url(time_period: str) -> str:
+    """
+    Generate the URL for extracting earthquakes that occurred during a specific time.
+
+    :param time: The time period for the query. Options are 'hour', 'day', 'week', 'month'.
+    :return: The URL path for the earthquakes that happened during the specified time period.
+    """
+    url = _TIME_PERIOD_URLS.get(time_period)
+    if url is None:
         raise ValueError(
-            f"Invalid time period: {time_period}. Valid options are: {valid_periods}",
-            time_period,
-            valid_periods,
+            f"Invalid time period: {time_period}. Valid options are: {', '.join(sorted(_TIME_PERIOD_URLS))}"
         )
-    else:
-        _logger.info(
-            f"Generated the url to upload earthquake events for the last {time_period}"
+
+    return url
+
+
+@lru_cache(maxsize=1)
+def load_env() -> Mapping[str, str]:
+    """
+    Snapshot the environment, falling back to the variables defined in the local .env file.
+
+    The file is only parsed the first time this is called, so importing the config (e.g. for
+    ``main.py --help``) no longer reads the filesystem or touches the environment. The .env
+    values are merged into the snapshot rather than written back into ``os.environ``, and
+    variables already set in the environment take precedence, as they do with ``load_dotenv``.
+    Set ``NEARQUAKE_SKIP_DOTENV=1`` to skip the .env file entirely, e.g. in containers where
+    the environment is already fully populated.
+
+    :return: A read-only mapping of the .env variables overlaid with the environment variables.
+    """
+    if os.environ.get("NEARQUAKE_SKIP_DOTENV") == "1":
+        return MappingProxyType(dict(os.environ))
+
+    return MappingProxyType({**dotenv_values(), **os.environ})
+
+
+def _require_env(variables: Mapping[str, str]) -> Mapping[str, str]:
+    """
+    Read a group of required variables from the environment, failing fast if any are missing.
+
+    :param variables: A mapping of the returned keys to the environment variable names.
+    :raises ValueError: If any of the environment variables are not set.
+    :return: A read-only mapping of the returned keys to the environment variable values.
+    """
+    env = load_env()
+    missing = [name for name in variables.values() if env.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing environment variables: {', '.join(missing)}")
+
+    return MappingProxyType({key: env[name] for key, name in variables.items()})
+
+
+@lru_cache(maxsize=1)
+def get_db_authentication() -> Mapping[str, str]:
+    """
+    Read the database credentials from the environment. The result is cached after the first call.
+
+    :raises ValueError: If any of the database credentials are missing from the environment.
+    :return: A read-only mapping with the user, host, dbname, port, password and sqlengine values.
+    """
+    return _require_env(
+        {
+            "user": "NEARQUAKE_USERNAME",
+            "host": "NEARQUAKE_HOST",
+            "dbname": "NEARQUAKE_DATABASE",
+            "port": "NEARQUAKE_PORT",
+            "password": "NEARQUAKE_PASSWORD",
+            "sqlengine": "NEARQUAKE_ENGINE",
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def get_postgres_connection_url() -> str:
+    """
+    Generate the URL used to connect to the nearquake database. The URL is built once and cached.
+
+    :raises ValueError: If any of the database credentials are missing from the environment.
+    :return: The SQLAlchemy connection URL.
+    """
+    db_authentication = get_db_authentication()
+
+    # Escape the user and password so characters like '@', ':' or '/' don't break the URL
+    netloc = f"{quote(db_authentication['user'], safe='')}:{quote(db_authentication['password'], safe='')}@{db_authentication['host']}:{db_authentication['port']}"
+    return urlunsplit(
+        (
+            db_authentication["sqlengine"],
+            netloc,
+            f"/{db_authentication['dbname']}",
+            "",
+            "",
         )
-        return API_BASE_URL.format(time_period=time_period)
+    )
 
 
-DB_AUTHENTICATION = {
-    "user": os.environ.get("NEARQUAKE_USERNAME"),
-    "host": os.environ.get("NEARQUAKE_HOST"),
-    "dbname": os.environ.get("NEARQUAKE_DATABASE"),
-    "port": os.environ.get("NEARQUAKE_PORT"),
-    "password": os.environ.get("NEARQUAKE_PASSWORD"),
-    "sqlengine": os.environ.get("NEARQUAKE_ENGINE"),
-}
+@lru_cache(maxsize=1)
+def get_twitter_authentication() -> Mapping[str, str]:
+    """
+    Read the Twitter API credentials from the environment. The result is cached after the first call.
 
-POSTGRES_CONNECTION_URL = f"{DB_AUTHENTICATION['sqlengine']}://{DB_AUTHENTICATION['user']}:{DB_AUTHENTICATION['password']}@{DB_AUTHENTICATION['host']}:{DB_AUTHENTICATION['port']}/{DB_AUTHENTICATION['dbname']}"
+    :raises ValueError: If any of the Twitter credentials are missing from the environment.
+    :return: A read-only mapping keyed by the Twitter credential names.
+    """
+    return _require_env(
+        {
+            "CONSUMER_KEY": "CONSUMER_KEY",
+            "CONSUMER_SECRET": "CONSUMER_SECRET",
+            "ACCESS_TOKEN": "ACCESS_TOKEN",
+            "ACCESS_TOKEN_SECRET": "ACCESS_TOKEN_SECRET",
+            "BEARER_TOKEN": "BEARER_TOKEN",
+        }
+    )
 
 
-TWITTER_AUTHENTICATION = {
-    "CONSUMER_KEY": os.environ.get("CONSUMER_KEY"),
-    "CONSUMER_SECRET": os.environ.get("CONSUMER_SECRET"),
-    "ACCESS_TOKEN": os.environ.get("ACCESS_TOKEN"),
-    "ACCESS_TOKEN_SECRET": os.environ.get("ACCESS_TOKEN_SECRET"),
-    "BEARER_TOKEN": os.environ.get("BEARER_TOKEN"),
-}
+@lru_cache(maxsize=1)
+def get_bluesky_authentication() -> Mapping[str, str]:
+    """
+    Read the BlueSky credentials from the environment. The result is cached after the first call.
 
-BLUESKY_USER_NAME = os.environ.get("BLUESKY_USER_NAME")
-BLUESKY_PASSWORD = os.environ.get("BLUESKY_PASSWORD")
-
-TWEET_CONCLUSION = [
-    "How do you prepare? Share tips and stay safe! #earthquakePrep. Data provided by #usgs",
-    "Were you near the epicenter? Share your experience. #earthquake. Data provided by #usgs",
-    "In an #earthquake, use stairs, not elevators! 🚶‍♂️🚶‍♀ #safetyfirst. Data provided by #usgs",
-]
-
-
-CHAT_PROMPT = [
-    "Tell me an interesting fact about earthquakes in 140 characters or less, but come close as possible to the 140 characters. Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes. I already know about the largest earthquake facts",
-    "Tell me one common misconceptions about earthquakes in 140 characters or less, but come close as possible to the 140 characters. Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Share tips to prepare for earthquakes in 140 characters or less. Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What should I do if i'm in earthquake in in 140 characters or less. Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What emergency supplies do you think are crucial to have in an earthquake kit? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know the safest spots to take cover during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're outdoors during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're indoors during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What lessons have you learned from past earthquakes that can help others prepare? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What are some items that should be in my earthquake emergency kit? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What steps can schools take to ensure the safety of students and staff during earthquakes? Share your school preparedness ideas! Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What considerations should tourists or visitors keep in mind for earthquake safety when visiting earthquake-prone areas? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "How do you ensure that your workplace is prepared for earthquakes? Share your office safety practices! Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What steps can be taken to support mental health and well-being after experiencing an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What are some consideration before purchasing earthquake insurance? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "walk me through a pros or cons of earthquake insurance? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What community resources are available to assist with earthquake preparedness efforts? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "How do you stay calm and focused during the chaos of an earthquake? Share your mindfulness techniques! Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Give me one government agency that deals with eartquakes and what their role. Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What are the most common misconceptions about earthquake safety? Let's debunk them! Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What steps can individuals take to support earthquake relief efforts in affected areas? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "What innovative technologies or inventions could improve earthquake preparedness and response in the future? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "How do you ensure the structural integrity of your home or workplace against earthquake damage? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're in a swimming pool during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're in a sky scraper during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're in an air plane during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're in a boat during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're driving during an earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "Do you know what to do if you're in a elevator during earthquake? Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes",
-    "How do you ensure the safety of children and infants during earthquakes? Share your child safety tips!",
-    "How do you stay informed about earthquake risks and updates in your area? Share your favorite resources for earthquake information!",
-]
-
-
-COORDINATE_LOOKUP_BASE_URL = "{BASE_URL}?latitude={latitude}&longitude={longitude}&localityLanguage=en&key={API_KEY}"
+    :raises ValueError: If either of the BlueSky credentials is missing from the environment.
+    :return: A read-only mapping with the BlueSky user name and password.
+    """
+    return _require_env(
+        {
+            "USER_NAME": "BLUESKY_USER_NAME",
+            "PASSWORD": "BLUESKY_PASSWORD",
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def get_geo_authentication() -> Mapping[str, str]:
+    """
+    Read the reverse geocoding base URL and API key from the environment. The result is cached
+    after the first call, so building a lookup URL per event doesn't re-read the environment.
+
+    :raises ValueError: If the base URL or API key is missing from the environment.
+    :return: A read-only mapping with the BASE_URL and API_KEY values.
+    """
+    return _require_env(
+        {
+            "BASE_URL": "GEO_REVERSE_LOOKUP_BASE_URL",
+            "API_KEY": "GEO_API_KEY",
+        }
+    )
 
 
 def generate_coordinate_lookup_detail_url(latitude, longitude) -> str:
@@ -140,14 +243,24 @@ def generate_coordinate_lookup_detail_url(latitude, longitude) -> str:
     :param long: Longitude of the location
     :return: str: A fully formatted URL with specified latitude and longitude.
     """
-    return COORDINATE_LOOKUP_BASE_URL.format(
-        BASE_URL=os.environ.get("GEO_REVERSE_LOOKUP_BASE_URL"),
-        latitude=latitude,
-        longitude=longitude,
-        API_KEY=os.environ.get("GEO_API_KEY"),
-    )
+    geo_authentication = get_geo_authentication()
+    return f"{geo_authentication['BASE_URL']}?latitude={latitude}&longitude={longitude}&localityLanguage=en&key={geo_authentication['API_KEY']}"
 
 
-def tweet_conclusion_text():
-    tweet_conclusion_text = random.choice(TWEET_CONCLUSION)
-    return tweet_conclusion_text
+def tweet_conclusion_text() -> str:
+    """
+    Pick a random closing line for a post.
+
+    :return: A closing line from TWEET_CONCLUSION.
+    """
+    return _random.choice(TWEET_CONCLUSION)
+
+
+def chat_prompt() -> str:
+    """
+    Pick a random prompt used to generate an earthquake fact or tip.
+
+    :return: A question from CHAT_PROMPT joined with its ending.
+    """
+    question, ending = _random.choice(CHAT_PROMPT)
+    return question + ending
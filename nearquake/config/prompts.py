@@ -0,0 +1,136 @@
+TWEET_CONCLUSION = (
+    "How do you prepare? Share tips and stay safe! #earthquakePrep. Data provided by #usgs",
+    "Were you near the epicenter? Share your experience. #earthquake. Data provided by #usgs",
+    "In an #earthquake, use stairs, not elevators! 🚶‍♂️🚶‍♀ #safetyfirst. Data provided by #usgs",
+)
+
+
+# Formatting instructions that most chat prompts end with. They're stored once, and
+# chat_prompt() joins them onto the question it picks.
+CHAT_PROMPT_SUFFIX = " Convert the response to be appropriate for a Twitter post, and include some hashtags. Do not include quotes"
+
+# (question, ending) pairs. The endings that don't use CHAT_PROMPT_SUFFIX are kept as
+# written, so every joined prompt matches the text the model has always been sent.
+CHAT_PROMPT = (
+    (
+        "Tell me an interesting fact about earthquakes in 140 characters or less, but come close as possible to the 140 characters.",
+        CHAT_PROMPT_SUFFIX + ". I already know about the largest earthquake facts",
+    ),
+    (
+        "Tell me one common misconceptions about earthquakes in 140 characters or less, but come close as possible to the 140 characters.",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Share tips to prepare for earthquakes in 140 characters or less.",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What should I do if i'm in earthquake in in 140 characters or less.",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What emergency supplies do you think are crucial to have in an earthquake kit?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know the safest spots to take cover during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're outdoors during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're indoors during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What lessons have you learned from past earthquakes that can help others prepare?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What are some items that should be in my earthquake emergency kit?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What steps can schools take to ensure the safety of students and staff during earthquakes? Share your school preparedness ideas!",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What considerations should tourists or visitors keep in mind for earthquake safety when visiting earthquake-prone areas?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "How do you ensure that your workplace is prepared for earthquakes? Share your office safety practices!",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What steps can be taken to support mental health and well-being after experiencing an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What are some consideration before purchasing earthquake insurance?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    ("walk me through a pros or cons of earthquake insurance?", CHAT_PROMPT_SUFFIX),
+    (
+        "What community resources are available to assist with earthquake preparedness efforts?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "How do you stay calm and focused during the chaos of an earthquake? Share your mindfulness techniques!",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Give me one government agency that deals with eartquakes and what their role.",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What are the most common misconceptions about earthquake safety? Let's debunk them!",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What steps can individuals take to support earthquake relief efforts in affected areas?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "What innovative technologies or inventions could improve earthquake preparedness and response in the future?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "How do you ensure the structural integrity of your home or workplace against earthquake damage?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're in a swimming pool during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're in a sky scraper during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're in an air plane during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're in a boat during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're driving during an earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "Do you know what to do if you're in a elevator during earthquake?",
+        CHAT_PROMPT_SUFFIX,
+    ),
+    (
+        "How do you ensure the safety of children and infants during earthquakes? Share your child safety tips!",
+        "",
+    ),
+    (
+        "How do you stay informed about earthquake risks and updates in your area? Share your favorite resources for earthquake information!",
+        "",
+    ),
+)
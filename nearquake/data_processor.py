@@ -1,20 +1,22 @@
 import logging
 from abc import ABC, abstractmethod
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, timezone
-from typing import List, Type, TypeVar
+from itertools import batched
+from typing import Iterator, List, Tuple, Type, TypeVar
 
-from sqlalchemy import and_, func
+from sqlalchemy import DateTime, Float, and_, bindparam, func, select
 from sqlalchemy.orm import Session
-from tqdm import tqdm
 
 from nearquake.app.db import Base, EventDetails, LocationDetails, Post
 from nearquake.config import (
     EARTHQUAKE_POST_THRESHOLD,
     REPORTED_SINCE_THRESHOLD,
-    TIMESTAMP_NOW,
     generate_coordinate_lookup_detail_url,
     generate_time_range_url,
+    get_geo_authentication,
+    timestamp_now,
 )
 from nearquake.post_manager import post_and_save_tweet
 from nearquake.utils import (
@@ -29,11 +31,23 @@ _logger = logging.getLogger(__name__)
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Reverse geocoding lookups are I/O bound, so a handful run concurrently per batch
+GEOCODE_MAX_WORKERS = 8
+
+# Backfill downloads from earthquake.usgs.gov run ahead of the inserts on a small pool
+BACKFILL_MAX_WORKERS = 4
+
+# Number of event rows built and inserted at a time, so a large backfill isn't held in memory
+INSERT_BATCH_SIZE = 5000
+
+# Number of rows fetched at a time when streaming a date range summary
+SUMMARY_YIELD_PER = 1000
+
 
 class BaseDataUploader(ABC):
     def __init__(self, conn: Session):
         self.conn = conn
-        self.TIMESTAMP_NOW = TIMESTAMP_NOW.strftime("%Y-%m-%d %H:%M:%S")
+        self.TIMESTAMP_NOW = timestamp_now().replace(tzinfo=None, microsecond=0)
 
     @abstractmethod
     def _extract(self):
@@ -52,60 +66,46 @@ class UploadEarthQuakeEvents(BaseDataUploader):
 
     def _extract(self, url) -> List:
         """
-        Extracts earthquake data from earthquake.usgs.gov, and returns a list of events that are not in the current database
+        Extracts earthquake data from earthquake.usgs.gov, and returns the list of events in the response
 
         Note: this function only works for earthquake.usgs.gov urls , since it's expect the JSON api repsonse to follow a specific format.
 
         :param url: earthquake.usgs.gov api url
-        :return: a list of earthquake events
+        :return: a list of earthquake events, which is empty if the request failed
         """
-
         data = fetch_json_data_from_url(url=url)
-        try:
-            event_ids_from_api = {i["id"] for i in data["features"]}
-            existing_event_records = self.conn.fetch_many(
-                model=EventDetails, column="id_event", items=event_ids_from_api
-            )
-            self.existing_event_ids = [
-                record.id_event for record in existing_event_records
-            ]
+        if data is None:
+            _logger.error("Failed to download the earthquakes from %s", url)
+            return []
 
-            new_events = [
-                i for i in data["features"] if i["id"] not in self.existing_event_ids
-            ]
-        except TypeError:
-            new_events = data["features"]
-
-        except Exception as e:
-            _logger.error(f"Encountered an unexpected error: {e} {event_ids_from_api}")
-        return new_events
+        return data["features"]
 
-    def _fetch_event_details(self, event) -> EventDetails:
+    def _fetch_event_details(self, event) -> dict:
         id_event = event["id"]
         properties = event["properties"]
-        coordinates = event["geometry"]["coordinates"]
+        longitude, latitude, *_ = event["geometry"]["coordinates"]
         timestamp_utc = convert_timestamp_to_utc(properties.get("time"))
-        time_stamp_date = timestamp_utc.date().strftime("%Y-%m-%d")
-
-        return EventDetails(
-            id_event=id_event,
-            mag=properties.get("mag"),
-            ts_event_utc=timestamp_utc.strftime("%Y-%m-%d %H:%M:%S"),
-            ts_updated_utc=self.TIMESTAMP_NOW,
-            tz=properties.get("tz"),
-            felt=properties.get("felt"),
-            detail=properties.get("detail"),
-            cdi=properties.get("cdi"),
-            mmi=properties.get("mmi"),
-            status=properties.get("status"),
-            tsunami=properties.get("tsunami"),
-            type=properties.get("type"),
-            title=properties.get("title"),
-            date=time_stamp_date,
-            place=properties.get("place"),
-            longitude=coordinates[0],
-            latitude=coordinates[1],
-        )
+
+        return {
+            "id_event": id_event,
+            "mag": properties.get("mag"),
+            # The columns have no time zone, so bind the naive UTC datetimes directly
+            "ts_event_utc": timestamp_utc.replace(tzinfo=None),
+            "ts_updated_utc": self.TIMESTAMP_NOW,
+            "tz": properties.get("tz"),
+            "felt": properties.get("felt"),
+            "detail": properties.get("detail"),
+            "cdi": properties.get("cdi"),
+            "mmi": properties.get("mmi"),
+            "status": properties.get("status"),
+            "tsunami": properties.get("tsunami"),
+            "type": properties.get("type"),
+            "title": properties.get("title"),
+            "date": timestamp_utc.date(),
+            "place": properties.get("place"),
+            "longitude": longitude,
+            "latitude": latitude,
+        }
 
     @timer
     def upload(self, url: str) -> None:
@@ -113,22 +113,49 @@ class UploadEarthQuakeEvents(BaseDataUploader):
 
         :param url: earthquake.usgs.gov api url
         """
-        new_event = self._extract(url=url)
+        _logger.info("Uploading earthquake events from %s", url)
+        # The insert skips and counts the events that were already added, so there's
+        # no need to look up the existing ids first
+        self._load(new_event=self._extract(url=url), ignore_conflicts=True)
+
+    def _load(
+        self, new_event: List, ignore_conflicts: bool = False, commit: bool = True
+    ) -> None:
+        """
+        Inserts the new earthquake events into the database.
 
+        :param new_event: a list of earthquake events from the earthquake.usgs.gov api
+        :param ignore_conflicts: let the database skip the events that were already added
+        :param commit: commit after each batch, or leave the commit to the caller
+        """
         if len(new_event) > 0:
-            new_event_list = [
-                self._fetch_event_details(event=event) for event in tqdm(new_event)
-            ]
+            rows = (self._fetch_event_details(event=event) for event in new_event)
+
+            summary = Counter()
+            inserted = failed = 0
+            for batch in batched(rows, INSERT_BATCH_SIZE):
+                inserted_rows = self.conn.bulk_insert(
+                    EventDetails,
+                    batch,
+                    ignore_conflicts=ignore_conflicts,
+                    commit=commit,
+                )
+                if inserted_rows is None:
+                    failed += len(batch)
+                else:
+                    inserted += len(inserted_rows)
+                    summary.update(event["date"].isoformat() for event in inserted_rows)
 
-            self.conn.insert_many(new_event_list)
-            summary = Counter(
-                event.date.strftime("%Y-%m-%d") for event in new_event_list
-            )
             _logger.info(
-                f"Added {len(new_event_list)} records and {len(self.existing_event_ids)} records were already added. {dict(summary)}"
+                "Uploaded %s records, skipped %s already added. %s",
+                inserted,
+                len(new_event) - inserted - failed,
+                dict(summary),
             )
+            if failed:
+                _logger.error("Failed to upload %s records", failed)
         else:
-            _logger.info("No new records found")
+            _logger.info("No records found")
 
     @timer
     def backfill(self, start_date: str, end_date: str, interval: int = 15) -> None:
@@ -140,24 +167,76 @@ class UploadEarthQuakeEvents(BaseDataUploader):
         :param interval: The number of days to increment each start date within the range. defaults to 15 days
         """
 
-        date_range = backfill_valid_date_range(start_date, end_date, interval=interval)
+        date_range = [
+            (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+            for start, end in backfill_valid_date_range(
+                start_date, end_date, interval=interval
+            )
+        ]
+        failed_ranges = []
+
+        # Download the ranges concurrently, but keep the database work on this thread,
+        # inside a single transaction that's committed once the backfill is done
+        with ThreadPoolExecutor(
+            max_workers=BACKFILL_MAX_WORKERS
+        ) as executor, self.conn.session.no_autoflush:
+            for start, end, data in self._download_ranges(executor, date_range):
+                if data is None:
+                    _logger.error(
+                        "Failed to download the earthquakes between %s and %s",
+                        start,
+                        end,
+                    )
+                    failed_ranges.append((start, end))
+                    continue
 
-        for start, end in date_range:
-            start = start.strftime("%Y-%m-%d")
-            end = end.strftime("%Y-%m-%d")
+                _logger.info(
+                    "Running a backfill for earthquakes between %s and %s", start, end
+                )
+                # The insert skips the events that were already added, so there's
+                # no need to look up the existing ids first
+                self._load(
+                    new_event=data["features"], ignore_conflicts=True, commit=False
+                )
+
+        self.conn.session.commit()
 
-            url = generate_time_range_url(
-                start=start,
-                end=end,
+        if failed_ranges:
+            _logger.error(
+                "Backfill finished with %s of %s ranges missing, rerun them: %s",
+                len(failed_ranges),
+                len(date_range),
+                failed_ranges,
             )
+        else:
             _logger.info(
-                f"Running a backfill for earthquakes between {start} and {end}"
+                "Completed the Backfill for %s months!!! Horray :)", len(date_range)
             )
-            self.upload(url=url)
 
-        _logger.info(
-            f"Completed the Backfill for {len(date_range)} months!!! Horray :)"
-        )
+    @staticmethod
+    def _download_ranges(executor, date_range) -> Iterator[Tuple[str, str, dict]]:
+        """
+        Downloads the earthquakes for each date range on an executor, yielding the responses in order.
+
+        At most BACKFILL_MAX_WORKERS downloads are in flight, so the parsed responses don't pile up in
+        memory when the downloads get ahead of the caller.
+
+        :param executor: The executor the downloads are submitted to.
+        :param date_range: A list of (start, end) dates in 'YYYY-MM-DD' format.
+        :return: an iterator of (start, end, data) tuples, where data is None if the download failed.
+        """
+        pending = deque()
+        for start, end in date_range:
+            if len(pending) == BACKFILL_MAX_WORKERS:
+                earliest_start, earliest_end, download = pending.popleft()
+                yield earliest_start, earliest_end, download.result()
+
+            url = generate_time_range_url(start=start, end=end)
+            pending.append((start, end, executor.submit(fetch_json_data_from_url, url)))
+
+        while pending:
+            start, end, download = pending.popleft()
+            yield start, end, download.result()
 
 
 class UploadEarthQuakeLocation(BaseDataUploader):
@@ -175,7 +254,7 @@ class UploadEarthQuakeLocation(BaseDataUploader):
             .filter(LocationDetails.id_event == None, EventDetails.date == date)
         )
         results = query.all()
-        _logger.info(f"Extracted {len(results)} quake events on {date}")
+        _logger.info("Extracted %s quake events on %s", len(results), date)
         return results
 
     def _extract_between(self, start_date, end_date) -> list:
@@ -196,11 +275,14 @@ class UploadEarthQuakeLocation(BaseDataUploader):
         )
         results = query.all()
         _logger.info(
-            f"Successfully extracted {len(results)} earthquake events from {start_date} to {end_date}."
+            "Successfully extracted %s earthquake events from %s to %s.",
+            len(results),
+            start_date,
+            end_date,
         )
         return results
 
-    def _fetch_location_detail(self, event) -> LocationDetails:
+    def _fetch_location_detail(self, event) -> dict:
         id_event, latitude, longitude = event
         url = generate_coordinate_lookup_detail_url(
             latitude=latitude, longitude=longitude
@@ -208,54 +290,99 @@ class UploadEarthQuakeLocation(BaseDataUploader):
         content = fetch_json_data_from_url(url=url)
 
         if content is None:
-            _logger.info(f"Skipping {event}. The url returned none type. url: {url}")
+            _logger.info("Skipping %s. The url returned none type. url: %s", event, url)
             return None
 
         if content.get("error") is not None:
             _logger.error(
-                f"unable to get geocode for {event} content: {content} due to {content.get('error')} error "
+                "unable to get geocode for %s content: %s due to %s error ",
+                event,
+                content,
+                content.get("error"),
             )
 
         try:
-            return LocationDetails(
-                id_event=id_event,
-                continent=content.get("continent"),
-                continentCode=content.get("continentCode"),
-                countryName=content.get("countryName"),
-                countryCode=content.get("countryCode"),
-                principalSubdivision=content.get("principalSubdivision"),
-                principalSubdivisionCode=content.get("principalSubdivisionCode"),
-                city=content.get("city"),
-            )
+            return {
+                "id_event": id_event,
+                "continent": content.get("continent"),
+                "continentCode": content.get("continentCode"),
+                "countryName": content.get("countryName"),
+                "countryCode": content.get("countryCode"),
+                "principalSubdivision": content.get("principalSubdivision"),
+                "principalSubdivisionCode": content.get("principalSubdivisionCode"),
+                "city": content.get("city"),
+            }
 
         except Exception as e:
             _logger.error(
-                f"Encountered an error while attempting to extract long, and lattiude {e} content: {content} event {event}  url: {url}"
+                "Encountered an error while attempting to extract long, and lattiude %s content: %s event %s  url: %s",
+                e,
+                content,
+                event,
+                url,
             )
         return None
 
     @timer
     def upload(self, start_date: str, end_date: str = None, interval: int = 15):
 
-        date_range = backfill_valid_date_range(start_date, end_date, interval=interval)
+        # Fail before any work is done if the geocoding settings are missing, rather than
+        # from a lookup thread partway through the upload
+        get_geo_authentication()
 
-        for start, end in date_range:
-            start_date = start.strftime("%Y-%m-%d")
-            end_date = end.strftime("%Y-%m-%d")
+        date_range = backfill_valid_date_range(start_date, end_date, interval=interval)
 
-            new_events = self._extract_between(start_date=start_date, end_date=end_date)
-            extraction_period = f"from {start_date} to {end_date}"
+        # Each window is committed as soon as it's geocoded, so an error in a later window
+        # doesn't throw away the lookups that were already paid for
+        with ThreadPoolExecutor(max_workers=GEOCODE_MAX_WORKERS) as executor:
+            for start, end in date_range:
+                start_date = start.strftime("%Y-%m-%d")
+                end_date = end.strftime("%Y-%m-%d")
 
-            if new_events:
-                location_details = [
-                    self._fetch_location_detail(event=event) for event in new_events
-                ]
-                self.conn.insert_many(location_details)
-                _logger.info(
-                    f"Added {len(location_details)} location details {extraction_period}"
+                new_events = self._extract_between(
+                    start_date=start_date, end_date=end_date
                 )
-            else:
-                _logger.info(f"No new location records to add {extraction_period}")
+                extraction_period = f"from {start_date} to {end_date}"
+
+                if new_events:
+                    # Skip the lookups that failed, a None can't be inserted as a row
+                    location_details = [
+                        location_detail
+                        for location_detail in executor.map(
+                            self._fetch_location_detail, new_events
+                        )
+                        if location_detail is not None
+                    ]
+                    failed_lookups = len(new_events) - len(location_details)
+                    if failed_lookups:
+                        # The events still have no location, so the next run retries them
+                        _logger.warning(
+                            "Failed to geocode %s of %s events %s",
+                            failed_lookups,
+                            len(new_events),
+                            extraction_period,
+                        )
+                    # Skip the events that an overlapping run has already geocoded
+                    inserted_rows = self.conn.bulk_insert(
+                        LocationDetails,
+                        location_details,
+                        ignore_conflicts=True,
+                    )
+                    if inserted_rows is None:
+                        _logger.error(
+                            "Failed to add %s location details %s",
+                            len(location_details),
+                            extraction_period,
+                        )
+                    else:
+                        _logger.info(
+                            "Added %s location details %s",
+                            len(inserted_rows),
+                            extraction_period,
+                        )
+                else:
+                    _logger.info("No new location records to add %s", extraction_period)
+
         return None
 
     @timer
@@ -268,46 +395,57 @@ class UploadEarthQuakeLocation(BaseDataUploader):
 
         self.upload(start_date=start_date, end_date=end_date, interval=interval)
         _logger.info(
-            f"Backfill for earthquake locations between {start_date} and {end_date}"
+            "Backfill for earthquake locations between %s and %s", start_date, end_date
         )
 
 
 class TweetEarthquakeEvents(BaseDataUploader):
 
+    # Built once, the threshold and the start of the reporting window are bound on each call.
+    # The timestamp is compared as it's stored, so the (mag, ts_event_utc) index can be used.
+    _ELIGIBLE_QUAKES_QUERY = (
+        select(
+            EventDetails.id_event,
+            EventDetails.title,
+            EventDetails.ts_event_utc,
+            EventDetails.mag,
+        )
+        .join(
+            Post,
+            Post.id_event == EventDetails.id_event,
+            isouter=True,
+        )
+        .where(
+            EventDetails.mag > bindparam("threshold", type_=Float),
+            EventDetails.ts_event_utc > bindparam("since", type_=DateTime),
+            Post.id_event == None,
+        )
+    )
+
     def _extract(self) -> List:
-        query = (
-            self.conn.session.query(
-                EventDetails.id_event,
-                EventDetails.title,
-                EventDetails.ts_event_utc,
-                EventDetails.mag,
-            )
-            .join(
-                Post,
-                Post.id_event == EventDetails.id_event,
-                isouter=True,
-            )
-            .filter(
-                EventDetails.mag > EARTHQUAKE_POST_THRESHOLD,
-                TIMESTAMP_NOW - func.timezone("UTC", EventDetails.ts_event_utc)
-                < timedelta(seconds=REPORTED_SINCE_THRESHOLD),
-                Post.id_event == None,
-            )
+        # ts_event_utc has no time zone, so the window starts at a naive UTC datetime
+        since = timestamp_now().replace(tzinfo=None) - timedelta(
+            seconds=REPORTED_SINCE_THRESHOLD
         )
-        return query.all()
+        return self.conn.session.execute(
+            self._ELIGIBLE_QUAKES_QUERY,
+            {"threshold": EARTHQUAKE_POST_THRESHOLD, "since": since},
+        ).all()
 
     def upload(self):
 
         eligible_quakes = self._extract()
         if not eligible_quakes:
             _logger.info(
-                f"No recent earthquakes with a magnitude of {EARTHQUAKE_POST_THRESHOLD} or higher were found. Nothing was posted to twiter"
+                "No recent earthquakes with a magnitude of %s or higher were found. Nothing was posted to twiter",
+                EARTHQUAKE_POST_THRESHOLD,
             )
             return None
 
+        now = timestamp_now()
         for quake in eligible_quakes:
 
-            duration = TIMESTAMP_NOW - quake.ts_event_utc.replace(tzinfo=timezone.utc)
+            duration = now - quake.ts_event_utc.replace(tzinfo=timezone.utc)
             earthquake_ts_event = quake.ts_event_utc.strftime("%H:%M:%S")
 
             tweet_text = format_earthquake_alert(
@@ -323,7 +461,9 @@ class TweetEarthquakeEvents(BaseDataUploader):
 
             except Exception as e:
                 _logger.error(
-                    f"Encountered an error while attempting to post {tweet_text}. {e} "
+                    "Encountered an error while attempting to post %s. %s ",
+                    tweet_text,
+                    e,
                 )
 
         return None
@@ -331,15 +471,18 @@ class TweetEarthquakeEvents(BaseDataUploader):
 
 def get_date_range_summary(
     conn: Session, model: Type[ModelType], start_date: str, end_date: str
-) -> List[ModelType]:
+) -> Iterator[ModelType]:
     """
     Retrieves all records from a specified database model within a given date range.
 
+    The records are streamed from the database in chunks of SUMMARY_YIELD_PER rows as they're
+    iterated, so memory use stays bounded however long the date range is.
+
     :param conn: An instance of a database connection, used to interact with the database.
     :param model: The SQLAlchemy model class representing the database table to query.
     :param start_date: The start date of the period for which the data is to be retrieved.
     :param end_date: The end date of the period for which the data is to be retrieved.
-    :return: a list of all items meeting the queries criteria.
+    :return: an iterator over all items meeting the queries criteria.
     """
     query = conn.session.query(model).filter(
         and_(
@@ -349,4 +492,38 @@ def get_date_range_summary(
         )
     )
 
-    return query.all()
+    return iter(query.yield_per(SUMMARY_YIELD_PER))
+
+
+def get_date_range_counts(
+    conn: Session,
+    model: Type[ModelType],
+    start_date: str,
+    end_date: str,
+    magnitude_threshold: float,
+) -> Tuple[int, int]:
+    """
+    Counts the earthquakes recorded within a given date range, along with how many of them reached a
+    magnitude threshold. Both counts are computed by the database in a single query, so no rows are
+    loaded into the session.
+
+    :param conn: An instance of a database connection, used to interact with the database.
+    :param model: The SQLAlchemy model class representing the database table to query.
+    :param start_date: The start date of the period to count.
+    :param end_date: The end date of the period to count.
+    :param magnitude_threshold: The minimum magnitude for an earthquake to be counted in the second total.
+    :return: a tuple of the total number of earthquakes and the number at or above the threshold.
+    """
+    query = conn.session.query(
+        func.count(),
+        func.count().filter(model.mag >= magnitude_threshold),
+    ).filter(
+        and_(
+            model.ts_event_utc.between(start_date, end_date),
+            model.mag > 0,
+            model.type == "earthquake",
+        )
+    )
+
+    total, above_threshold = query.one()
+    return total, above_threshold
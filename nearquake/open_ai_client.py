@@ -1,11 +1,21 @@
 import logging
-import os
+from functools import lru_cache
 
 from openai import OpenAI
 
+from nearquake.config import load_env
+
 _logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+
+@lru_cache(maxsize=1)
+def get_client() -> OpenAI:
+    """
+    Create the OpenAI client on first use, so importing this module doesn't require the API key.
+
+    :return: An authenticated OpenAI client.
+    """
+    return OpenAI(api_key=load_env().get("OPENAI_API_KEY"))
 
 
 def generate_response(prompt: str, role: str = "user", model: str = "gpt-3.5") -> str:
@@ -21,11 +31,11 @@ def generate_response(prompt: str, role: str = "user", model: str = "gpt-3.5") -
     valid_roles = ["role", "user"]
 
     if role not in valid_roles:
-        _logger.error(f"Invalid role: {role}. Valid options are 'role' and 'user'.")
+        _logger.error("Invalid role: %s. Valid options are 'role' and 'user'.", role)
         raise ValueError("Error: Invalid role. Please choose 'role' or 'user'.")
 
     try:
-        completion = client.chat.completions.create(
+        completion = get_client().chat.completions.create(
             model=model,
             messages=[
                 {
@@ -34,10 +44,10 @@ def generate_response(prompt: str, role: str = "user", model: str = "gpt-3.5") -
                 },
             ],
         )
-        _logger.info(f"Prompt:{prompt}")
+        _logger.info("Prompt:%s", prompt)
 
         return completion.choices[0].message.content
 
     except Exception as e:
-        _logger.error(f"Unexepected error occured {e}")
+        _logger.error("Unexepected error occured %s", e)
         return f"Error {e}"
@@ -1,10 +1,12 @@
 import logging
 from abc import ABC, abstractmethod
+from functools import lru_cache
+
 import tweepy
 from atproto import Client
 
 from nearquake.app.db import Post
-from nearquake.config import TWITTER_AUTHENTICATION, BLUESKY_PASSWORD, BLUESKY_USER_NAME
+from nearquake.config import get_bluesky_authentication, get_twitter_authentication
 
 _logger = logging.getLogger(__name__)
 
@@ -20,38 +22,42 @@ class PlatformPoster(ABC):
 
 class TwitterPost(PlatformPoster):
     def __init__(self):
+        twitter_authentication = get_twitter_authentication()
         self.client = tweepy.Client(
-            bearer_token=TWITTER_AUTHENTICATION["BEARER_TOKEN"],
-            consumer_key=TWITTER_AUTHENTICATION["CONSUMER_KEY"],
-            consumer_secret=TWITTER_AUTHENTICATION["CONSUMER_SECRET"],
-            access_token=TWITTER_AUTHENTICATION["ACCESS_TOKEN"],
-            access_token_secret=TWITTER_AUTHENTICATION["ACCESS_TOKEN_SECRET"],
+            bearer_token=twitter_authentication["BEARER_TOKEN"],
+            consumer_key=twitter_authentication["CONSUMER_KEY"],
+            consumer_secret=twitter_authentication["CONSUMER_SECRET"],
+            access_token=twitter_authentication["ACCESS_TOKEN"],
+            access_token_secret=twitter_authentication["ACCESS_TOKEN_SECRET"],
         )
         _logger.info("Successfully authenticated with Twitter")
 
     def post(self, post_text: str) -> bool:
         try:
             self.client.create_tweet(text=post_text)
-            _logger.info(f"Successfully posted to Twitter: {post_text}")
+            _logger.info("Successfully posted to Twitter: %s", post_text)
             return True
         except Exception as e:
-            _logger.error(f"Failed to post to Twitter: {post_text}. Error: {e}")
+            _logger.error("Failed to post to Twitter: %s. Error: %s", post_text, e)
             return False
 
 
 class BlueSkyPost(PlatformPoster):
     def __init__(self):
+        bluesky_authentication = get_bluesky_authentication()
         self.client = Client()
-        self.client.login(BLUESKY_USER_NAME, BLUESKY_PASSWORD)
+        self.client.login(
+            bluesky_authentication["USER_NAME"], bluesky_authentication["PASSWORD"]
+        )
         _logger.info("Successfully authenticated with BlueSky")
 
     def post(self, post_text: str) -> bool:
         try:
             self.client.send_post(text=post_text)
-            _logger.info(f"Successfully posted to BlueSky: {post_text}")
+            _logger.info("Successfully posted to BlueSky: %s", post_text)
             return True
         except Exception as e:
-            _logger.error(f"Failed to post to BlueSky: {post_text}. Error: {e}")
+            _logger.error("Failed to post to BlueSky: %s. Error: %s", post_text, e)
             return False
 
 
@@ -63,18 +69,29 @@ def save_tweet_to_db(tweet_text: dict, conn) -> bool:
     """
     try:
         conn.insert(Post(**tweet_text))
-        _logger.info(f"Tweet saved to database: {tweet_text}")
+        _logger.info("Tweet saved to database: %s", tweet_text)
         return True
     except Exception as e:
-        _logger.error(f"Failed to save tweet to database {tweet_text}. Error: {e}")
+        _logger.error("Failed to save tweet to database %s. Error: %s", tweet_text, e)
         return False
 
 
-_PLATFORM = [TwitterPost()]
+_PLATFORM = [TwitterPost]
+
+
+@lru_cache(maxsize=1)
+def get_platforms() -> list:
+    """
+    Authenticate with every platform the first time a post is sent, so importing this module
+    doesn't create API clients.
+
+    :return: A list of authenticated platform posters.
+    """
+    return [platform() for platform in _PLATFORM]
 
 
 def post_to_all_platforms(text: str) -> dict:
-    for platform in _PLATFORM:
+    for platform in get_platforms():
         platform.post(text)
 
 
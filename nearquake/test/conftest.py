@@ -0,0 +1,35 @@
+import pytest
+import sqlalchemy.orm
+from sqlalchemy import event
+
+from nearquake.app.db import Base, EventDetails, LocationDetails
+from nearquake.utils.db_sessions import DbSessionManager
+
+
+@pytest.fixture
+def db_session_manager():
+    conn = DbSessionManager(url="sqlite:///:memory:")
+
+    # pysqlite doesn't emit BEGIN before a SAVEPOINT, so releasing one would commit. Let
+    # SQLAlchemy begin the transactions instead, so savepoints behave as on PostgreSQL.
+    @event.listens_for(conn.engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(conn.engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    # SQLite has no schemas, so the tables are created without them
+    conn.engine = conn.engine.execution_options(
+        schema_translate_map={"earthquake": None, "tweet": None}
+    )
+    conn.Session = sqlalchemy.orm.scoped_session(
+        sqlalchemy.orm.sessionmaker(bind=conn.engine)
+    )
+    Base.metadata.create_all(
+        conn.engine, tables=[EventDetails.__table__, LocationDetails.__table__]
+    )
+
+    with conn:
+        yield conn
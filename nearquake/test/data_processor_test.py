@@ -0,0 +1,313 @@
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from nearquake.app.db import EventDetails, LocationDetails
+from nearquake.config import timestamp_now
+from nearquake.data_processor import (
+    BACKFILL_MAX_WORKERS,
+    TweetEarthquakeEvents,
+    UploadEarthQuakeEvents,
+    UploadEarthQuakeLocation,
+    get_date_range_counts,
+    get_date_range_summary,
+)
+
+
+def make_feature(id_event, mag=5.0, time=1704067200000):
+    return {
+        "id": id_event,
+        "properties": {"mag": mag, "time": time, "type": "earthquake"},
+        "geometry": {"coordinates": [139.7, 35.7, 10.0]},
+    }
+
+
+def test_location_upload_skips_failed_lookups(db_session_manager):
+    db_session_manager.bulk_insert(
+        EventDetails,
+        [
+            {"id_event": f"us{i}", "date": date(2024, 1, 2), "latitude": 1.0}
+            for i in range(1, 4)
+        ],
+    )
+
+    def lookup(event):
+        if event.id_event == "us2":
+            return None
+        return {"id_event": event.id_event, "city": "Tokyo"}
+
+    with patch("nearquake.data_processor.get_geo_authentication"), patch.object(
+        UploadEarthQuakeLocation, "_fetch_location_detail", side_effect=lookup
+    ), patch("nearquake.data_processor._logger") as mock_logger:
+        UploadEarthQuakeLocation(conn=db_session_manager).upload(
+            start_date="2024-01-01", end_date="2024-01-16"
+        )
+
+    locations = db_session_manager.session.query(LocationDetails.id_event)
+    assert sorted(id_event for id_event, in locations) == ["us1", "us3"]
+    mock_logger.warning.assert_called_once_with(
+        "Failed to geocode %s of %s events %s",
+        1,
+        3,
+        "from 2024-01-01 to 2024-01-16",
+    )
+
+
+def test_location_upload_commits_each_window(db_session_manager):
+    db_session_manager.bulk_insert(
+        EventDetails,
+        [
+            {"id_event": "us1", "date": date(2024, 1, 2)},
+            {"id_event": "us2", "date": date(2024, 1, 12)},
+        ],
+    )
+
+    def lookup(event):
+        if event.id_event == "us2":
+            raise RuntimeError("Unexpected geocoding response")
+        return {"id_event": event.id_event, "city": "Tokyo"}
+
+    with patch("nearquake.data_processor.get_geo_authentication"), patch.object(
+        UploadEarthQuakeLocation, "_fetch_location_detail", side_effect=lookup
+    ):
+        with pytest.raises(RuntimeError):
+            UploadEarthQuakeLocation(conn=db_session_manager).upload(
+                start_date="2024-01-01", end_date="2024-01-21", interval=10
+            )
+
+    # The first window was committed before the second one failed
+    db_session_manager.session.rollback()
+    locations = db_session_manager.session.query(LocationDetails.id_event)
+    assert [id_event for id_event, in locations] == ["us1"]
+
+
+def test_location_upload_requires_geocoding_settings(db_session_manager):
+    with patch(
+        "nearquake.data_processor.get_geo_authentication",
+        side_effect=ValueError("Missing environment variables: GEO_API_KEY"),
+    ), patch.object(UploadEarthQuakeLocation, "_extract_between") as mock_extract:
+        with pytest.raises(ValueError, match="GEO_API_KEY"):
+            UploadEarthQuakeLocation(conn=db_session_manager).upload(
+                start_date="2024-01-01", end_date="2024-01-16"
+            )
+
+    mock_extract.assert_not_called()
+
+
+def test_backfill_reports_failed_downloads(db_session_manager):
+    responses = {
+        "2024-01-01": {"features": [make_feature("us1"), make_feature("us2")]},
+        "2024-01-11": None,
+        "2024-01-21": {"features": [make_feature("us3")]},
+    }
+
+    def fetch(url):
+        return next(data for start, data in responses.items() if start in url)
+
+    with patch(
+        "nearquake.data_processor.fetch_json_data_from_url", side_effect=fetch
+    ), patch("nearquake.data_processor._logger") as mock_logger:
+        UploadEarthQuakeEvents(conn=db_session_manager).backfill(
+            start_date="2024-01-01", end_date="2024-01-31", interval=10
+        )
+
+    events = db_session_manager.session.query(EventDetails.id_event)
+    assert sorted(id_event for id_event, in events) == ["us1", "us2", "us3"]
+    mock_logger.error.assert_any_call(
+        "Failed to download the earthquakes between %s and %s",
+        "2024-01-11",
+        "2024-01-21",
+    )
+    mock_logger.error.assert_called_with(
+        "Backfill finished with %s of %s ranges missing, rerun them: %s",
+        1,
+        3,
+        [("2024-01-11", "2024-01-21")],
+    )
+
+
+def test_download_ranges_bounds_downloads_in_flight():
+    class RecordingExecutor:
+        def __init__(self):
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        def submit(self, fn, url):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            future = Future()
+            future.set_result(url)
+            return future
+
+    executor = RecordingExecutor()
+    date_range = [
+        (f"2024-01-{day:02}", f"2024-01-{day + 1:02}") for day in range(1, 11)
+    ]
+
+    for start, end, url in UploadEarthQuakeEvents._download_ranges(
+        executor, date_range
+    ):
+        assert f"starttime={start}" in url
+        executor.in_flight -= 1
+
+    assert executor.max_in_flight == BACKFILL_MAX_WORKERS
+
+
+def test_upload_skips_existing_events(db_session_manager):
+    db_session_manager.bulk_insert(EventDetails, [{"id_event": "us1", "mag": 4.0}])
+    feed = {"features": [make_feature("us1"), make_feature("us2")]}
+
+    with patch(
+        "nearquake.data_processor.fetch_json_data_from_url", return_value=feed
+    ), patch("nearquake.data_processor._logger") as mock_logger:
+        UploadEarthQuakeEvents(conn=db_session_manager).upload(url="https://usgs")
+
+    assert db_session_manager.session.get(EventDetails, "us1").mag == 4.0
+    assert db_session_manager.session.get(EventDetails, "us2").mag == 5.0
+    mock_logger.info.assert_called_with(
+        "Uploaded %s records, skipped %s already added. %s",
+        1,
+        1,
+        {"2024-01-01": 1},
+    )
+
+
+def test_load_reports_failed_records(db_session_manager):
+    with patch("nearquake.data_processor._logger") as mock_logger:
+        UploadEarthQuakeEvents(conn=db_session_manager)._load(
+            new_event=[make_feature("us1"), make_feature("us1")]
+        )
+
+    assert db_session_manager.session.query(EventDetails).count() == 0
+    mock_logger.info.assert_called_with(
+        "Uploaded %s records, skipped %s already added. %s",
+        0,
+        0,
+        {},
+    )
+    mock_logger.error.assert_called_once_with("Failed to upload %s records", 2)
+
+
+def test_backfill_skips_existing_events(db_session_manager):
+    db_session_manager.bulk_insert(EventDetails, [{"id_event": "us1", "mag": 4.0}])
+    responses = {
+        # Both ranges include us2, which happened on the shared boundary date
+        "2024-01-01": {"features": [make_feature("us1"), make_feature("us2")]},
+        "2024-01-11": {"features": [make_feature("us2"), make_feature("us3")]},
+    }
+
+    def fetch(url):
+        return next(data for start, data in responses.items() if start in url)
+
+    with patch("nearquake.data_processor.fetch_json_data_from_url", side_effect=fetch):
+        UploadEarthQuakeEvents(conn=db_session_manager).backfill(
+            start_date="2024-01-01", end_date="2024-01-21", interval=10
+        )
+
+    events = db_session_manager.session.query(EventDetails.id_event)
+    assert sorted(id_event for id_event, in events) == ["us1", "us2", "us3"]
+    assert db_session_manager.session.get(EventDetails, "us1").mag == 4.0
+    assert db_session_manager.session.get(EventDetails, "us3").ts_event_utc == (
+        datetime(2024, 1, 1)
+    )
+
+
+def insert_summary_events(conn):
+    conn.bulk_insert(
+        EventDetails,
+        [
+            {"id_event": f"us{i}", "mag": mag, "type": type, "ts_event_utc": ts}
+            for i, (mag, type, ts) in enumerate(
+                [
+                    (4.5, "earthquake", datetime(2024, 1, 1, 1)),
+                    (6.0, "earthquake", datetime(2024, 1, 1, 2)),
+                    (4.4, "earthquake", datetime(2024, 1, 1, 3)),
+                    (0, "earthquake", datetime(2024, 1, 1, 4)),
+                    (None, "earthquake", datetime(2024, 1, 1, 5)),
+                    (5.0, "quarry blast", datetime(2024, 1, 1, 6)),
+                    (7.0, "earthquake", datetime(2024, 1, 3)),
+                ]
+            )
+        ],
+    )
+
+
+def test_get_date_range_counts(db_session_manager):
+    insert_summary_events(db_session_manager)
+
+    total, above_threshold = get_date_range_counts(
+        conn=db_session_manager,
+        model=EventDetails,
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 2),
+        magnitude_threshold=4.5,
+    )
+
+    # Events without a magnitude, or with a magnitude of 0, aren't counted
+    assert total == 3
+    assert above_threshold == 2
+
+
+def test_get_date_range_counts_no_events(db_session_manager):
+    assert get_date_range_counts(
+        conn=db_session_manager,
+        model=EventDetails,
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 2),
+        magnitude_threshold=4.5,
+    ) == (0, 0)
+
+
+def test_get_date_range_summary(db_session_manager):
+    insert_summary_events(db_session_manager)
+
+    # Stream in chunks smaller than the result, so more than one chunk is fetched
+    with patch("nearquake.data_processor.SUMMARY_YIELD_PER", 2):
+        events = get_date_range_summary(
+            conn=db_session_manager,
+            model=EventDetails,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 2),
+        )
+
+        assert iter(events) is events
+        assert sorted(event.id_event for event in events) == ["us0", "us1", "us2"]
+
+
+def test_eligible_quakes_query_compares_the_timestamp_column():
+    compiled = TweetEarthquakeEvents._ELIGIBLE_QUAKES_QUERY.compile(
+        dialect=postgresql.dialect()
+    )
+
+    assert set(compiled.binds) == {"threshold", "since"}
+    assert "fct__event_details.ts_event_utc > %(since)s" in str(compiled)
+
+
+def test_tweet_extract_finds_recent_unposted_quakes(db_session_manager):
+    # The Post model's server default is PostgreSQL only, so create the table directly
+    db_session_manager.session.execute(
+        text(
+            "CREATE TABLE fct__post (id_post VARCHAR(50) PRIMARY KEY, id_event VARCHAR(50))"
+        )
+    )
+    db_session_manager.session.execute(
+        text("INSERT INTO fct__post VALUES ('post1', 'us4')")
+    )
+    now = timestamp_now().replace(tzinfo=None)
+    db_session_manager.bulk_insert(
+        EventDetails,
+        [
+            {"id_event": "us1", "mag": 5.0, "ts_event_utc": now - timedelta(hours=1)},
+            {"id_event": "us2", "mag": 4.0, "ts_event_utc": now - timedelta(hours=1)},
+            {"id_event": "us3", "mag": 6.0, "ts_event_utc": now - timedelta(hours=3)},
+            {"id_event": "us4", "mag": 6.0, "ts_event_utc": now - timedelta(hours=1)},
+        ],
+    )
+
+    eligible_quakes = TweetEarthquakeEvents(conn=db_session_manager)._extract()
+
+    assert [quake.id_event for quake in eligible_quakes] == ["us1"]
@@ -1,3 +1,5 @@
+from datetime import date, datetime
+
 import pytest
 import sqlalchemy.orm
 from sqlalchemy import MetaData, create_engine
@@ -47,3 +49,73 @@ def test_event_details_columns():
     columns = EventDetails.__table__.columns
     assert "id_event" in columns
     assert columns["id_event"].primary_key is True
+
+
+def test_event_details_indexes():
+    indexes = {
+        index.name: [column.name for column in index.columns]
+        for index in EventDetails.__table__.indexes
+    }
+    assert indexes == {
+        "ix_event_details_date_id_event": ["date", "id_event"],
+        "ix_event_details_mag_ts_event_utc": ["mag", "ts_event_utc"],
+    }
+
+
+def test_bulk_insert(db_session_manager):
+    rows = [
+        {
+            "id_event": f"us{i}",
+            "mag": 4.5 + i,
+            "ts_event_utc": datetime(2024, 1, 1, i),
+            "date": date(2024, 1, 1),
+        }
+        for i in range(3)
+    ]
+
+    db_session_manager.bulk_insert(EventDetails, rows)
+
+    assert db_session_manager.session.query(EventDetails).count() == 3
+    assert db_session_manager.session.get(EventDetails, "us2").mag == 6.5
+
+
+def test_bulk_insert_no_rows(db_session_manager):
+    db_session_manager.bulk_insert(EventDetails, [])
+
+    assert db_session_manager.session.query(EventDetails).count() == 0
+
+
+def test_bulk_insert_ignore_conflicts(db_session_manager):
+    db_session_manager.bulk_insert(EventDetails, [{"id_event": "us1", "mag": 4.5}])
+    inserted = db_session_manager.bulk_insert(
+        EventDetails,
+        [{"id_event": "us1", "mag": 6.0}, {"id_event": "us2", "mag": 5.0}],
+        ignore_conflicts=True,
+    )
+
+    assert inserted == [{"id_event": "us2", "mag": 5.0}]
+    assert db_session_manager.session.query(EventDetails).count() == 2
+    assert db_session_manager.session.get(EventDetails, "us1").mag == 4.5
+
+
+def test_bulk_insert_without_commit(db_session_manager):
+    db_session_manager.bulk_insert(EventDetails, [{"id_event": "us1"}], commit=False)
+    db_session_manager.session.rollback()
+
+    assert db_session_manager.session.query(EventDetails).count() == 0
+
+
+def test_bulk_insert_failure_keeps_uncommitted_rows(db_session_manager):
+    db_session_manager.bulk_insert(EventDetails, [{"id_event": "us1"}], commit=False)
+    # The duplicate id fails, but only this insert is rolled back
+    assert (
+        db_session_manager.bulk_insert(
+            EventDetails, [{"id_event": "us2"}, {"id_event": "us1"}], commit=False
+        )
+        is None
+    )
+    db_session_manager.bulk_insert(EventDetails, [{"id_event": "us3"}], commit=False)
+    db_session_manager.session.commit()
+
+    events = db_session_manager.session.query(EventDetails.id_event)
+    assert sorted(id_event for id_event, in events) == ["us1", "us3"]
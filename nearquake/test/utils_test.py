@@ -5,6 +5,7 @@ import pytest
 import requests
 
 from nearquake.utils import (
+    _HTTP,
     convert_timestamp_to_utc,
     create_dir,
     fetch_json_data_from_url,
@@ -46,13 +47,13 @@ def test_create_dir_failure(mock_makedirs):
         create_dir(path)
 
 
-@patch("requests.get")
+@patch("nearquake.utils._HTTP.get")
 def test_fetch_json_data_from_url_success(mock_get):
     url = "https://api.example.com/data"
     expected_json_data = {"key": "value"}
 
     mock_response = MagicMock()
-    mock_response.text = '{"key": "value"}'
+    mock_response.content = b'{"key": "value"}'
     mock_get.return_value = mock_response
 
     json_data = fetch_json_data_from_url(url)
@@ -60,7 +61,7 @@ def test_fetch_json_data_from_url_success(mock_get):
     assert json_data == expected_json_data
 
 
-@patch("requests.get")
+@patch("nearquake.utils._HTTP.get")
 def test_fetch_json_data_from_url_http_error(mock_get):
     url = "https://api.example.com/data"
 
@@ -71,14 +72,22 @@ def test_fetch_json_data_from_url_http_error(mock_get):
     assert json_data is None
 
 
-@patch("requests.get")
+@patch("nearquake.utils._HTTP.get")
 def test_fetch_json_data_from_url_json_decode_error(mock_get):
     url = "https://api.example.com/data"
 
     mock_response = MagicMock()
-    mock_response.text = "Not a JSON response"
+    mock_response.content = b"Not a JSON response"
     mock_get.return_value = mock_response
 
     json_data = fetch_json_data_from_url(url)
 
     assert json_data is None
+
+
+def test_http_retries_are_bounded():
+    retry = _HTTP.get_adapter("https://earthquake.usgs.gov").max_retries
+
+    assert retry.total == 3
+    assert 429 not in retry.status_forcelist
+    assert retry.respect_retry_after_header is False
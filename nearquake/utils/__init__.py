@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import time
@@ -6,13 +5,41 @@ from datetime import datetime, timedelta, timezone
 from functools import wraps
 from io import BytesIO
 
+import orjson
 import requests
 from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from nearquake.config import EVENT_DETAIL_URL, TIMESTAMP_NOW, tweet_conclusion_text
+from nearquake.config import (
+    generate_event_detail_url,
+    timestamp_now,
+    tweet_conclusion_text,
+)
 
 _logger = logging.getLogger(__name__)
 
+# Shared HTTP session, so repeated requests to the same host reuse the TCP and TLS connection.
+# Connection errors and transient server errors are retried with a short backoff, and once the
+# retries run out the last response is returned so the callers' status checks still apply.
+# Rate limited (429) responses aren't retried, and a Retry-After header is ignored, since
+# waiting as long as the server asks could hold a scheduled run past the next one.
+_HTTP = requests.Session()
+_HTTP.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        ),
+    ),
+)
+
 
 def extract_properties(data: dict, keylist: list):
     """
@@ -60,15 +87,15 @@ def get_earthquake_image_url(url):
     :param url: URL to the earthquake data.
     :return: String containing the URL to the image, or None if no image could be found.
     """
-    response = requests.get(url, timeout=5)
+    response = _HTTP.get(url, timeout=5)
     if response.status_code != 200:
         _logger.error(
-            f"Failed to get data from URL {url}. Status code: {response.status_code}"
+            "Failed to get data from URL %s. Status code: %s", url, response.status_code
         )
         return None
 
     try:
-        data = json.loads(response.text)
+        data = orjson.loads(response.content)
         image_url = data["properties"]["products"]["shakemap"][0]["contents"][
             "download/pga.jpg"
         ]["url"]
@@ -86,11 +113,11 @@ def extract_url_content(url: str) -> bytes:
     :param url: The URL from which content will be extracted.
     :return: The content retrieved from the URL in binary format (bytes).
     """
-    response = requests.get(url, timeout=5)
+    response = _HTTP.get(url, timeout=5)
 
     if response.status_code != 200:
         _logger.error(
-            f"Failed to get data from URL {url}. Status code: {response.status_code}"
+            "Failed to get data from URL %s. Status code: %s", url, response.status_code
         )
         return None
 
@@ -130,10 +157,10 @@ def save_content(content: bytes, content_id: str, directory: str = "image"):
     try:
         with open(os.path.join(directory, f"{content_id}.jpg"), "wb") as f:
             f.write(content)
-            _logger.info(f"Image downloaded and saved to {file_path}")
+            _logger.info("Image downloaded and saved to %s", file_path)
 
     except Exception as e:
-        _logger.error("An error occured while writing the file: %e", e)
+        _logger.error("An error occured while writing the file: %s", e)
 
 
 def fetch_json_data_from_url(url):
@@ -158,30 +185,32 @@ def fetch_json_data_from_url(url):
 
     """
     try:
-        response = requests.get(url, timeout=30)
+        response = _HTTP.get(url, timeout=30)
         response.raise_for_status()  # Raise an HTTPError for bad requests (4xx or 5xx)
 
         try:
-            return json.loads(response.text)
+            return orjson.loads(response.content)
 
-        except json.JSONDecodeError:
-            _logger.error(f"Failed to decode JSON from response: {response.text}")
+        except orjson.JSONDecodeError:
+            _logger.error("Failed to decode JSON from response: %s", response.text)
             return None
 
     except requests.exceptions.HTTPError as e:
-        _logger.error(f"HTTP error occurred while fetching data from {url}: {e}")
+        _logger.error("HTTP error occurred while fetching data from %s: %s", url, e)
         return None
 
     except requests.exceptions.ConnectionError as e:
-        _logger.error(f"Connection error occurred while fetching data from {url}: {e}")
+        _logger.error(
+            "Connection error occurred while fetching data from %s: %s", url, e
+        )
         return None
 
     except requests.exceptions.Timeout as e:
-        _logger.error(f"Timeout error occurred while fetching data from {url}: {e}")
+        _logger.error("Timeout error occurred while fetching data from %s: %s", url, e)
         return None
 
     except requests.exceptions.RequestException as e:
-        _logger.error(f"An error occurred while fetching data from {url}: {e}")
+        _logger.error("An error occurred while fetching data from %s: %s", url, e)
         return None
 
 
@@ -258,7 +287,10 @@ def backfill_valid_date_range(start_date, end_date, interval: int) -> tuple:
     date_range = generate_date_range(start_date, end_date, interval=interval)
 
     _logger.info(
-        f"Backfill process started for the range {start_date} to {end_date}. Running in module {__name__}."
+        "Backfill process started for the range %s to %s. Running in module %s.",
+        start_date,
+        end_date,
+        __name__,
     )
     return date_range
 
@@ -272,9 +304,9 @@ def create_dir(path: str):
     """
     try:
         os.makedirs(path, exist_ok=True)
-        _logger.info(f"Directory ensured at path: {path}")
+        _logger.info("Directory ensured at path: %s", path)
     except Exception as e:
-        _logger.error(f"Failed to create directory at {path}: {e}")
+        _logger.error("Failed to create directory at %s: %s", path, e)
         raise ValueError
 
     return None
@@ -299,11 +331,11 @@ def format_earthquake_alert(
     :return: A dictionary formatted as an alert or fact post.
     """
 
-    ts_upload_utc = TIMESTAMP_NOW.strftime("%Y-%m-%d %H:%M:%S")
+    ts_upload_utc = timestamp_now().strftime("%Y-%m-%d %H:%M:%S")
 
     if post_type == "event":
         return {
-            "post": f"Recent #Earthquake: {message} reported at {ts_event} UTC ({duration.seconds/60:.0f} minutes ago). #EarthquakeAlert. \nSee more details at {EVENT_DETAIL_URL.format(id=id_event)}. \n {tweet_conclusion_text()}",
+            "post": f"Recent #Earthquake: {message} reported at {ts_event} UTC ({duration.seconds/60:.0f} minutes ago). #EarthquakeAlert. \nSee more details at {generate_event_detail_url(id_event)}. \n {tweet_conclusion_text()}",
             "ts_upload_utc": ts_upload_utc,
             "id_event": id_event,
             "post_type": post_type,
@@ -349,7 +381,7 @@ def timer(func):
         else:
             value, period = duration // 3600, "minutes"
 
-        _logger.info(f"{func.__name__} completed in {value:.0f} {period}")
+        _logger.info("%s completed in %.0f %s", func.__name__, value, period)
         return result
 
     return wrapper
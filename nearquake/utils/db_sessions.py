@@ -1,10 +1,15 @@
 import logging
+from contextlib import nullcontext
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 _logger = logging.getLogger(__name__)
 
+# Dialect specific insert constructs, which support ON CONFLICT DO NOTHING
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 class DbSessionManager:
     """
@@ -97,6 +102,65 @@ class DbSessionManager:
             _logger.error("Failed to execute insert_many query: %s", e, exc_info=True)
             self.session.rollback()
 
+    def bulk_insert(self, model, rows, ignore_conflicts=False, commit=True):
+        """
+        Inserts multiple rows into the table of an SQLAlchemy ORM model with a single executemany
+        INSERT, skipping the unit of work that insert_many goes through for each instance.
+
+        :param model: SQLAlchemy ORM model class.
+        :param rows: A list of dictionaries keyed by the model's column names.
+        :param ignore_conflicts: Skip rows that conflict with an existing row with ON CONFLICT DO
+        NOTHING, so the database does the deduplication. Only supported on PostgreSQL and SQLite.
+        :param commit: Commit after the insert. Pass False to group several inserts into one
+        transaction committed by the caller; a failed insert then only rolls back its own rows.
+        :return: A list of the rows that were inserted, which excludes the skipped conflicting rows,
+        or None if the insert failed.
+        """
+        if not rows:
+            return []
+
+        if ignore_conflicts:
+            dialect = self.engine.dialect.name
+            if dialect not in _CONFLICT_INSERTS:
+                raise ValueError(
+                    f"ignore_conflicts is not supported for the {dialect} dialect"
+                )
+            # Only the primary keys of the inserted rows are returned, so the skipped
+            # rows can be told apart without a separate query
+            primary_key = model.__table__.primary_key.columns
+            statement = (
+                _CONFLICT_INSERTS[dialect](model)
+                .on_conflict_do_nothing()
+                .returning(*primary_key)
+            )
+        else:
+            statement = insert(model)
+
+        try:
+            # Without a commit the insert runs in a savepoint, so a failure only rolls back
+            # these rows and not the earlier ones still waiting in the caller's transaction
+            with nullcontext() if commit else self.session.begin_nested():
+                result = self.session.execute(statement, rows)
+                if ignore_conflicts:
+                    inserted_keys = {tuple(key) for key in result}
+                    inserted = [
+                        row
+                        for row in rows
+                        if tuple(row[column.key] for column in primary_key)
+                        in inserted_keys
+                    ]
+                else:
+                    inserted = list(rows)
+            if commit:
+                self.session.commit()
+            return inserted
+
+        except Exception as e:
+            _logger.error("Failed to execute bulk_insert query: %s", e, exc_info=True)
+            if commit:
+                self.session.rollback()
+            return None
+
     def close(self):
         """Closes the database session."""
         try: